@@ -1,28 +1,64 @@
 """Utilities to create and store records of jobs."""
-from copy import deepcopy
+import contextlib
 import datetime
 import functools
 from getpass import getuser
 import inspect
 import json
+from json.encoder import encode_basestring_ascii
 import multiprocessing as mp
+import os
 from os import environ, getcwd
-from pathlib import Path
+from pathlib import Path, PurePath
 import importlib
-import pkg_resources
+import importlib.util
+import math
 import platform
 import random
+import re
+import subprocess
 import sys
 from types import ModuleType
-from typing import Any, Callable, Dict, Optional, Union, Sequence, cast, List
-from uuid import uuid4
-
-import git
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+try:
+    import orjson  # type: ignore
+    _have_orjson = True
+except ImportError:
+    _have_orjson = False
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
 
 
 _TIMESTAMP_FMT = '%Y_%m_%d_%H_%M_%S'
 DOCKER_BUILD_HASH_LOCATION = Path('/etc/docker-build-git-hash')
 
+# Check which of the optional libraries are available for seeding without
+# actually importing them, since importing the large machine learning
+# frameworks is slow
+_have_numpy = importlib.util.find_spec('numpy') is not None
+_have_tensorflow = importlib.util.find_spec('tensorflow') is not None
+_have_torch = importlib.util.find_spec('torch') is not None
+
+# Absolute paths of output directories already created (or found to exist) by
+# tracked functions, for which the directory need not be created again
+_known_directories: Set[str] = set()
+
 
 def _format_json(obj: Any, char_limit: Optional[int] = None) -> Any:
     """Normalize arbitrary objects to ensure they are JSON serializable.
@@ -43,12 +79,30 @@ def _format_json(obj: Any, char_limit: Optional[int] = None) -> Any:
         returned.
 
     """
-    try:
-        string = json.dumps(obj)
+    # Fast paths for common types, avoiding a trial serialization
+    if obj is None or isinstance(obj, (bool, float)):
+        # Always serializable and the serialized form is always short
+        return obj
+    elif char_limit is None and isinstance(obj, (str, int)):
+        # Always serializable and there is no need to find the length
+        return obj
+    elif isinstance(obj, str):
+        # Equivalent to the serialization performed by json.dumps
+        string = encode_basestring_ascii(obj)
         serializable = True
-    except (TypeError, OverflowError):
+    elif isinstance(obj, int):
+        string = int.__repr__(obj)
+        serializable = True
+    elif isinstance(obj, PurePath):
         string = repr(obj)
         serializable = False
+    else:
+        try:
+            string = json.dumps(obj)
+            serializable = True
+        except (TypeError, OverflowError):
+            string = repr(obj)
+            serializable = False
 
     if char_limit is not None and len(string) > char_limit:
         string = '<suppressed due to excessive length>'
@@ -60,16 +114,14 @@ def _format_json(obj: Any, char_limit: Optional[int] = None) -> Any:
             return string
 
 
-def get_environment_info() -> Dict[str, Any]:
-    """Get information about the current environment in a dictionary.
+@functools.lru_cache(maxsize=1)
+def _get_static_environment_info() -> Dict[str, Any]:
+    """Get information about the environment that cannot change in a process.
 
-    The following information is included:
-    - hostname on which the job was executed
-    - information about the SLURM job, if this process is running inside SLURM
-    - username that submitted the job
-    - date and time the job was run
-    - list of GPUs that were available to the job
-    - list of command line arguments that began the process
+    Some of these calls are slow (e.g. platform.platform may run external
+    programs), so the result is computed only once for the lifetime of the
+    process. The returned dictionary is shared between callers and must not
+    be modified.
 
     Returns
     -------
@@ -80,20 +132,12 @@ def get_environment_info() -> Dict[str, Any]:
     info: Dict[str, Any] = {}
 
     # Store various pieces of system/platform information
-    info['argv'] = sys.argv
-    try:
-        # Only available in Python 3.10+
-        info['orig_argv'] = sys.orig_argv  # type: ignore
-    except AttributeError:
-        pass
     info['platform'] = sys.platform
     info['platform_info'] = platform.platform()
     info['python_version'] = sys.version
     info['python_implementation'] = sys.implementation.name
     info['python_executable'] = sys.executable
-    info['cwd'] = getcwd()
     info['hostname'] = platform.node()
-    info['python_path'] = sys.path
     info['cpu_count'] = mp.cpu_count()
     try:
         info['user'] = getuser()
@@ -106,12 +150,65 @@ def get_environment_info() -> Dict[str, Any]:
     # image
     if DOCKER_BUILD_HASH_LOCATION.exists():
         with DOCKER_BUILD_HASH_LOCATION.open() as f:
-            docker_build_hash: Optional[str] = f.read().splitlines()[0]
+            docker_build_hash: Optional[str] = (
+                f.readline().rstrip('\r\n') or None
+            )
         info['git_hash_at_docker_build'] = docker_build_hash
 
     return info
 
 
+def get_environment_info() -> Dict[str, Any]:
+    """Get information about the current environment in a dictionary.
+
+    The following information is included:
+    - hostname on which the job was executed
+    - information about the SLURM job, if this process is running inside SLURM
+    - username that submitted the job
+    - date and time the job was run
+    - list of GPUs that were available to the job
+    - list of command line arguments that began the process
+
+    Returns
+    -------
+    dict
+        Dictionary containing the relevant information.
+
+    """
+    info: Dict[str, Any] = {}
+
+    info['argv'] = sys.argv
+    try:
+        # Only available in Python 3.10+
+        info['orig_argv'] = sys.orig_argv  # type: ignore
+    except AttributeError:
+        pass
+    info['cwd'] = getcwd()
+    info['python_path'] = sys.path
+
+    # Information that does not change during the process is only gathered
+    # once
+    info.update(_get_static_environment_info())
+
+    return info
+
+
+@functools.lru_cache(maxsize=1)
+def _get_slurm_variable_names() -> Tuple[str, ...]:
+    """Get the names of the SLURM environment variables of this process.
+
+    SLURM sets these variables when the job is launched, so the environment is
+    only scanned for them once. Their values are not cached.
+
+    Returns
+    -------
+    Tuple[str, ...]
+        Names of all environment variables beginning with 'SLURM'.
+
+    """
+    return tuple(v for v in environ if v.startswith('SLURM'))
+
+
 def get_environment_vars(
     extra_environment_variables: Optional[Sequence[str]] = None
 ) -> Dict[str, Any]:
@@ -140,7 +237,7 @@ def get_environment_vars(
         'PYTHONPATH',
     ]
     if 'SLURM_JOB_ID' in environ:
-        var_list += [v for v in environ if v.startswith('SLURM')]
+        var_list += _get_slurm_variable_names()
     if extra_environment_variables is not None:
         var_list += extra_environment_variables
     for var in var_list:
@@ -149,6 +246,68 @@ def get_environment_vars(
     return vars_dict
 
 
+@functools.lru_cache(maxsize=None)
+def _get_seeders(
+    seed_numpy: bool,
+    seed_tensorflow: bool,
+    seed_torch: bool,
+) -> Tuple[Callable[[int], Any], ...]:
+    """Get the functions that set the random seeds of the selected libraries.
+
+    Libraries are imported upon the first call for each combination of
+    options, and the seeding functions are cached for subsequent calls.
+
+    Parameters
+    ----------
+    seed_numpy: bool
+        Whether to include the numpy library, if it is installed.
+    seed_tensorflow: bool
+        Whether to include the tensorflow library, if it is installed.
+    seed_torch: bool
+        Whether to include the torch library, if it is installed.
+
+    Returns
+    -------
+    Tuple[Callable[[int], Any], ...]:
+        Functions that each set the random seed of one library, starting with
+        the standard library's 'random' module.
+
+    """
+    seeders: List[Callable[[int], Any]] = [random.seed]
+
+    # A library may be installed but still fail to import (e.g. due to a
+    # mismatched CUDA installation), in which case it is skipped
+
+    # Numpy
+    if seed_numpy and _have_numpy:
+        try:
+            import numpy as np
+            seeders.append(np.random.seed)
+
+        except ImportError:
+            pass
+
+    # Tensorflow
+    if seed_tensorflow and _have_tensorflow:
+        try:
+            import tensorflow as tf
+            seeders.append(tf.random.set_seed)
+
+        except ImportError:
+            pass
+
+    # Pytorch
+    if seed_torch and _have_torch:
+        try:
+            import torch
+            seeders.append(torch.manual_seed)
+
+        except ImportError:
+            pass
+
+    return tuple(seeders)
+
+
 def seed_tasks(
     seed: Optional[int] = None,
     seed_numpy: bool = True,
@@ -189,38 +348,230 @@ def seed_tasks(
     if seed is None:
         seed = random.randint(0, 1000000)
 
-    # Standard library random module
-    random.seed(seed)
+    for seeder in _get_seeders(seed_numpy, seed_tensorflow, seed_torch):
+        seeder(seed)
 
-    # Set seeds
-    # Numpy
-    if seed_numpy:
-        try:
-            import numpy as np  # noqa: F811
-            np.random.seed(seed)
+    return seed
 
-        except ImportError:
-            pass
 
-    # Tensorflow
-    if seed_tensorflow:
-        try:
-            import tensorflow as tf  # noqa: F811
-            tf.random.set_seed(seed)
+def _run_git(directory: str, *args: str) -> str:
+    """Run a git command in a directory and return its output.
 
-        except ImportError:
-            pass
+    Parameters
+    ----------
+    directory: str
+        Directory in which to run the command.
+    *args: str
+        Arguments to the git command.
 
-    # Pytorch
-    if seed_torch:
-        try:
-            import torch  # noqa: F811
-            torch.manual_seed(seed)
+    Returns
+    -------
+    str:
+        Standard output of the command.
 
-        except ImportError:
-            pass
+    """
+    result = subprocess.run(
+        ['git', '-C', directory, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return result.stdout
 
-    return seed
+
+def _get_git_info_subprocess(
+    module_path: Optional[str],
+    module_name: str,
+) -> Dict[str, Any]:
+    """Get git information for a module file by running git directly.
+
+    This requires only a few invocations of git, and therefore is
+    considerably faster than going through GitPython.
+
+    Parameters
+    ----------
+    module_path: Optional[str]
+        Path to the module's source file.
+    module_name: str
+        Name of the module.
+
+    Returns
+    -------
+    Dict[str, Any]:
+        Dictionary containing the following keys: module_path, name,
+        git_commit_hash, git_active_branch, git_is_dirty, git_remotes,
+        git_working_dir
+
+    Raises
+    ------
+    OSError:
+        If the git executable could not be run.
+
+    """
+    directory = (
+        getcwd() if module_path is None else os.path.dirname(module_path)
+    )
+
+    try:
+        working_dir, commit_hash, branch = _run_git(
+            directory,
+            'rev-parse',
+            '--show-toplevel',
+            'HEAD',
+            '--abbrev-ref',
+            'HEAD',
+        ).splitlines()
+    except subprocess.CalledProcessError:
+        raise RuntimeError(
+            f"Module '{module_name}' at path '{module_path}' is not "
+            "within a git repository"
+        )
+
+    status = _run_git(
+        directory,
+        'status',
+        '--porcelain',
+        '--untracked-files=no',
+    )
+
+    # Exits with a non-zero status if there are no remotes
+    try:
+        remotes_config = _run_git(
+            directory,
+            'config',
+            '--get-regexp',
+            r'^remote\..*\.url$',
+        )
+    except subprocess.CalledProcessError:
+        remotes_config = ''
+    remotes: Dict[str, str] = {}
+    for line in remotes_config.splitlines():
+        key, url = line.split(' ', 1)
+        remotes.setdefault(key[len('remote.'):-len('.url')], url)
+
+    record: Dict[str, Any] = {}
+    record['module_path'] = module_path
+    record['name'] = module_name
+    # In detached state, the abbreviated ref is just HEAD
+    record['git_active_branch'] = 'detached' if branch == 'HEAD' else branch
+    record['git_commit_hash'] = commit_hash
+    record['git_is_dirty'] = status != ''
+    record['git_remotes'] = remotes
+    record['git_working_dir'] = os.path.normpath(working_dir)
+
+    return record
+
+
+def _get_git_info_gitpython(
+    module_path: Optional[str],
+    module_name: str,
+) -> Dict[str, Any]:
+    """Get git information for a module file using GitPython.
+
+    Parameters
+    ----------
+    module_path: Optional[str]
+        Path to the module's source file.
+    module_name: str
+        Name of the module.
+
+    Returns
+    -------
+    Dict[str, Any]:
+        Dictionary containing the following keys: module_path, name,
+        git_commit_hash, git_active_branch, git_is_dirty, git_remotes,
+        git_working_dir
+
+    """
+    # GitPython is slow to import and only needed as a fallback
+    import git
+
+    try:
+        repo = git.Repo(module_path, search_parent_directories=True)
+    except git.InvalidGitRepositoryError:
+        raise RuntimeError(
+            f"Module '{module_name}' at path '{module_path}' is not "
+            "within a git repository"
+        )
+
+    record: Dict[str, Any] = {}
+    record['module_path'] = module_path
+    record['name'] = module_name
+    try:
+        record['git_active_branch'] = str(repo.active_branch)
+    except TypeError:
+        # We are in detached state
+        record['git_active_branch'] = 'detached'
+    record['git_commit_hash'] = str(repo.head.commit)
+    record['git_is_dirty'] = repo.is_dirty()
+    record['git_remotes'] = {item.name: item.url for item in repo.remotes}
+    record['git_working_dir'] = repo.working_dir
+
+    return record
+
+
+def _get_git_is_dirty(working_dir: str) -> bool:
+    """Check whether a git repository has uncommitted changes.
+
+    Parameters
+    ----------
+    working_dir: str
+        Working directory of the repository.
+
+    Returns
+    -------
+    bool:
+        Whether there are uncommitted changes to tracked files.
+
+    """
+    try:
+        status = _run_git(
+            working_dir,
+            'status',
+            '--porcelain',
+            '--untracked-files=no',
+        )
+    except OSError:
+        # GitPython is slow to import and only needed as a fallback
+        import git
+        return git.Repo(working_dir).is_dirty()
+    return status != ''
+
+
+@functools.lru_cache(maxsize=None)
+def _get_git_info_cached(
+    module_path: Optional[str],
+    module_name: str,
+) -> Dict[str, Any]:
+    """Get git information for a module file, caching the result.
+
+    Finding the repository and checking whether it is dirty requires calling
+    git, so the result is computed only once per module for the lifetime of
+    the process. The returned dictionary is shared between callers and must
+    not be modified.
+
+    Parameters
+    ----------
+    module_path: Optional[str]
+        Path to the module's source file.
+    module_name: str
+        Name of the module.
+
+    Returns
+    -------
+    Dict[str, Any]:
+        Dictionary containing the following keys: module_path, name,
+        git_commit_hash, git_active_branch, git_is_dirty, git_remotes,
+        git_working_dir
+
+    """
+    try:
+        return _get_git_info_subprocess(module_path, module_name)
+    except OSError:
+        # The git executable could not be run directly, fall back to
+        # GitPython, which may be configured to use a different executable
+        return _get_git_info_gitpython(module_path, module_name)
 
 
 def get_git_info(
@@ -229,6 +580,11 @@ def get_git_info(
 ) -> Dict[str, str]:
     """Get a record containing information about a module's git repository.
 
+    The information is gathered the first time it is requested for a given
+    module and re-used for subsequent requests within the same process.
+    However, if allow_dirty is False, whether the repository is dirty is
+    checked again on every request.
+
     Parameters
     ----------
     module: Union[str, ModuleType]
@@ -261,39 +617,73 @@ def get_git_info(
             raise RuntimeError(no_file_str)
         module_path = module.__file__
 
-    try:
-        repo = git.Repo(module_path, search_parent_directories=True)
-    except git.InvalidGitRepositoryError:
-        raise RuntimeError(
-            f"Module '{module_name}' at path '{module_path}' is not "
-            "within a git repository"
-        )
+    cached_record = _get_git_info_cached(module_path, module_name)
 
-    if not allow_dirty and repo.is_dirty():
-        raise RuntimeError(
-            f"Repository for module '{module_name}' is dirty (has "
-            "uncommitted changes)."
-        )
+    if allow_dirty:
+        is_dirty = cached_record['git_is_dirty']
+    else:
+        # The working tree may have changed since the information was cached
+        is_dirty = _get_git_is_dirty(cached_record['git_working_dir'])
+        if is_dirty:
+            raise RuntimeError(
+                f"Repository for module '{module_name}' is dirty (has "
+                "uncommitted changes)."
+            )
 
-    record: Dict[str, Any] = {}
-    record['module_path'] = module_path
-    record['name'] = module_name
-    try:
-        record['git_active_branch'] = str(repo.active_branch)
-    except TypeError:
-        # We are in detached state
-        record['git_active_branch'] = 'detached'
-    record['git_commit_hash'] = str(repo.head.commit)
-    record['git_is_dirty'] = repo.is_dirty()
-    record['git_remotes'] = {item.name: item.url for item in repo.remotes}
-    record['git_working_dir'] = repo.working_dir
+    # Copy so that the cached record cannot be altered by the caller
+    record = dict(cached_record)
+    record['git_is_dirty'] = is_dirty
+    record['git_remotes'] = dict(cached_record['git_remotes'])
 
     return record
 
 
+@functools.lru_cache(maxsize=1)
+def _get_installed_packages_cached() -> Dict[str, str]:
+    """Get installed packages and their versions, caching the result.
+
+    Scanning the installed distributions is slow, so it is performed only
+    once for the lifetime of the process. The returned dictionary is shared
+    between callers and must not be modified.
+
+    Returns
+    -------
+    Dict[str, str]
+        Dictionary mapping package name to package version for all
+        currently installed modules that have version information.
+
+    """
+    try:
+        from importlib.metadata import distributions
+    except ImportError:
+        # Python < 3.8
+        import pkg_resources
+        return {
+            p.key: p.version for p in pkg_resources.working_set
+        }
+
+    packages: Dict[str, str] = {}
+    for dist in distributions():
+        name = dist.metadata['Name']
+        if not name:
+            continue
+
+        # Normalize names in the same way as pkg_resources to give consistent
+        # keys. Where a package is found multiple times on the path, the
+        # first one is the one that is imported
+        key = re.sub('[^A-Za-z0-9.]+', '-', name).lower()
+        if key not in packages:
+            packages[key] = dist.version
+
+    return packages
+
+
 def get_installed_packages() -> Dict[str, str]:
     """Get a list of all currently installed packages and their versions.
 
+    The installed packages are found the first time this is called and
+    re-used for subsequent calls within the same process.
+
     Returns
     -------
     Dict[str, str]
@@ -301,14 +691,99 @@ def get_installed_packages() -> Dict[str, str]:
         currently installed modules that have version information.
 
     """
-    return {
-        p.key: p.version for p in pkg_resources.working_set
-    }
+    return dict(_get_installed_packages_cached())
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Check whether an object contains any non-finite floats.
+
+    Parameters
+    ----------
+    obj: Any
+        A JSON serializable object.
+
+    Returns
+    -------
+    bool:
+        Whether obj is, or contains within any nested dictionaries, lists or
+        tuples, a float that is infinite or NaN.
+
+    """
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    elif isinstance(obj, dict):
+        return any(
+            _has_non_finite(k) or _has_non_finite(v) for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+
+def _dump_json(obj: Any) -> bytes:
+    """Serialize an object to indented JSON.
+
+    The orjson library is used if it is installed, as it is considerably
+    faster than the standard library, falling back to the standard library
+    otherwise. Both write the same indentation, such that chained record
+    files have a consistent layout. Objects containing non-finite floats are
+    always written by the standard library, since orjson would write them as
+    null rather than NaN, Infinity or -Infinity.
+
+    Parameters
+    ----------
+    obj: Any
+        A JSON serializable object.
+
+    Returns
+    -------
+    bytes:
+        UTF-8 encoded JSON representation of the object.
+
+    """
+    if _have_orjson and not _has_non_finite(obj):
+        try:
+            return orjson.dumps(
+                obj,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # Some objects accepted by the standard library are not supported
+            # by orjson, e.g. integers larger than 64 bits
+            pass
+    return json.dumps(obj, indent=2).encode()
+
+
+def _parse_json(data: bytes) -> Any:
+    """Deserialize JSON data.
+
+    The orjson library is used if it is installed, falling back to the
+    standard library otherwise.
+
+    Parameters
+    ----------
+    data: bytes
+        UTF-8 encoded JSON data.
+
+    Returns
+    -------
+    Any:
+        Deserialized data.
+
+    """
+    if _have_orjson:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            # Files written by the standard library may contain values that
+            # orjson does not accept, such as NaN
+            pass
+    return json.loads(data)
 
 
 def write_record(
     record_path: Path,
-    record: Dict[str, Any]
+    record: Union[Dict[str, Any], List[Dict[str, Any]]]
 ) -> None:
     """Save a job record file into an existing output directory.
 
@@ -316,15 +791,282 @@ def write_record(
     ----------
     record_path: Path
         Path to the output file. Directory must exist.
-    record: Optional[Dict[str: Any]]
-        A job record, as a dictionary.
+    record: Union[Dict[str, Any], List[Dict[str, Any]]]
+        A job record, as a dictionary, or a list of chained job records.
 
     """
     # Save the record to file
     if not record_path.name.endswith('.json'):
         record_path = record_path.with_name(record_path.stem + '.json')
-    with record_path.open('w') as jf:
-        json.dump(record, jf, indent=4)
+    _write_record_file(record_path, record)
+
+
+def _write_record_file(
+    record_path: Union[Path, str],
+    record: Union[Dict[str, Any], List[Dict[str, Any]]]
+) -> None:
+    """Write a job record to a file without altering the path.
+
+    The record is first written to a temporary file alongside the output
+    file, which is then moved into place, such that readers never see a
+    partially written record. Each write uses its own temporary file, such
+    that concurrent writes to the same record do not interfere.
+
+    Parameters
+    ----------
+    record_path: Union[Path, str]
+        Path to the output file, including the extension. Directory must
+        exist.
+    record: Union[Dict[str, Any], List[Dict[str, Any]]]
+        A job record, as a dictionary, or a list of chained job records.
+
+    """
+    data = memoryview(_dump_json(record))
+    record_path = os.fspath(record_path)
+    tmp_path = f'{record_path}.{_uuid4_str()}.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, record_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _uuid4_str() -> str:
+    """Generate a random (version 4) UUID as a string.
+
+    This is equivalent to str(uuid.uuid4()), but avoids constructing a UUID
+    object.
+
+    Returns
+    -------
+    str:
+        The UUID in its canonical hexadecimal form.
+
+    """
+    data = bytearray(os.urandom(16))
+    # Set the version and variant bits as specified by RFC 4122
+    data[6] = (data[6] & 0x0f) | 0x40
+    data[8] = (data[8] & 0x3f) | 0x80
+    h = data.hex()
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+def _make_directory(path: str, parents: bool, remember: bool = False) -> None:
+    """Create a directory, if it does not already exist.
+
+    Parameters
+    ----------
+    path: str
+        Path to the directory.
+    parents: bool
+        Whether to create any missing parents of the directory.
+    remember: bool
+        Whether to remember that the directory exists, such that later calls
+        with the same absolute path and remember set return without any
+        system calls. Otherwise, the directory is always checked.
+
+    """
+    if remember and path in _known_directories:
+        return
+    if parents:
+        os.makedirs(path, exist_ok=True)
+    else:
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            if not os.path.isdir(path):
+                raise
+    if remember and os.path.isabs(path):
+        _known_directories.add(path)
+
+
+def _forget_directory(path: str) -> None:
+    """Forget that a directory and all of its parents are known to exist.
+
+    Parameters
+    ----------
+    path: str
+        Path to the directory.
+
+    """
+    while True:
+        _known_directories.discard(path)
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+
+
+def _save_record(
+    record_path: str,
+    record: Dict[str, Any],
+    chain: bool
+) -> None:
+    """Write a job record, either on its own or within a chained record file.
+
+    Parameters
+    ----------
+    record_path: str
+        Path to the output file, including the extension.
+    record: Dict[str, Any]
+        A job record, as a dictionary.
+    chain: bool
+        Whether to add the record to a chained record file.
+
+    """
+    if chain:
+        _update_chained_record(record_path, record)
+    else:
+        _write_record_file(record_path, record)
+
+
+def _bind_arguments(
+    parameter_names: Tuple[str, ...],
+    defaults: Dict[str, Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """Bind arguments to a signature of positional-or-keyword parameters.
+
+    This is a faster alternative to inspect.Signature.bind followed by
+    inspect.BoundArguments.apply_defaults for the common case where all
+    parameters of the function may be passed either positionally or by
+    keyword.
+
+    Parameters
+    ----------
+    parameter_names: Tuple[str, ...]
+        Names of the parameters of the function, in order.
+    defaults: Dict[str, Any]
+        Default values of the parameters that have them.
+    args: Tuple[Any, ...]
+        Positional arguments of the call.
+    kwargs: Dict[str, Any]
+        Keyword arguments of the call.
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]:
+        Mapping of parameter name to value for every parameter of the
+        function, in order. None if the arguments do not match the
+        parameters, in which case inspect.Signature.bind should be used
+        instead to handle the call.
+
+    """
+    if len(args) > len(parameter_names):
+        return None
+
+    arguments = dict(zip(parameter_names, args))
+    n_kwargs_used = 0
+    for name in parameter_names[len(args):]:
+        if name in kwargs:
+            arguments[name] = kwargs[name]
+            n_kwargs_used += 1
+        elif name in defaults:
+            arguments[name] = defaults[name]
+        else:
+            # Missing argument
+            return None
+
+    if n_kwargs_used != len(kwargs):
+        # Unexpected keyword argument, or an argument passed both positionally
+        # and by keyword
+        return None
+
+    return arguments
+
+
+@contextlib.contextmanager
+def _lock_record(record_path: str) -> Iterator[None]:
+    """Hold an exclusive lock on a record file while it is updated.
+
+    The lock is held on a separate lock file alongside the record file, since
+    the record file itself is replaced whenever it is written.
+
+    Parameters
+    ----------
+    record_path: str
+        Path to the record file.
+
+    """
+    fd = os.open(record_path + '.lock', os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        if sys.platform == 'win32':
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # Locking gives up after ten attempts, keep waiting
+                    pass
+            try:
+                yield
+            finally:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+    finally:
+        # Closing the file also releases the lock
+        os.close(fd)
+
+
+def _update_chained_record(
+    record_path: str,
+    record: Dict[str, Any]
+) -> None:
+    """Add a record to a chained record file, or update it if present.
+
+    The record replaces the previous record with the same UUID, or is
+    appended otherwise. If the file does not exist, the record is written on
+    its own. If it contains a single record, the file is re-written as a list
+    of the previous and the new record. The file is locked while it is
+    updated, such that concurrent calls chaining to the same file do not
+    interfere.
+
+    Parameters
+    ----------
+    record_path: str
+        Path to the record file.
+    record: Dict[str, Any]
+        A job record, as a dictionary.
+
+    """
+    with _lock_record(record_path):
+        try:
+            with open(record_path, 'rb') as jf:
+                previous = _parse_json(jf.read())
+        except FileNotFoundError:
+            _write_record_file(record_path, record)
+            return
+
+        if isinstance(previous, list):
+            records = previous
+        else:
+            records = [previous]
+        for i, previous_record in enumerate(records):
+            if (
+                isinstance(previous_record, dict) and
+                previous_record.get('uuid') == record['uuid']
+            ):
+                records[i] = record
+                break
+        else:
+            records.append(record)
+
+        if isinstance(previous, list) or len(records) > 1:
+            _write_record_file(record_path, records)
+        else:
+            _write_record_file(record_path, record)
 
 
 def tracked(
@@ -436,6 +1178,8 @@ def tracked(
         which it belongs, or there are uncommitted changes within any of the
         packages specified by 'extra_modules'. This 'strict' setting
         allows you to be sure that the code that is run can be re-run later.
+        The repositories are checked on every call, whereas the remaining git
+        information is gathered on the first call only.
     include_package_inventory: bool
         Include the inventory of all loaded modules with version information
         (this can get quite long).
@@ -472,7 +1216,8 @@ def tracked(
     chain_records: bool
         If True, a pre-existing record file will have a new record appended to
         it within the same file. If False, a pre-existing record file will be
-        overwritten.
+        overwritten. Chained record files are locked while they are updated
+        using a lock file alongside the record file.
 
     Examples
     --------
@@ -663,31 +1408,56 @@ def tracked(
         signature = inspect.signature(function)
 
         # Check all parameters specified actually exist
-        if directory_parameter is not None:
-            output_dir_parameter_loc = cast(str, directory_parameter)
-            if output_dir_parameter_loc not in signature.parameters:
-                raise ValueError(
-                    f"No such parameter '{output_dir_parameter_loc}' "
-                    "for function '{function.__name__}'."
-                )
-        if subdirectory_name_parameter is not None:
-            if subdirectory_name_parameter not in signature.parameters:
-                raise ValueError(
-                    f"No such parameters '{subdirectory_name_parameter}' "
-                    "for function '{function.__name__}'."
-                )
-        if directory_injection_parameter is not None:
-            if directory_injection_parameter not in signature.parameters:
-                raise ValueError(
-                    f"No such parameter '{directory_injection_parameter}' "
-                    f"for function '{function.__name__}'."
-                )
-        if seed_parameter is not None:
-            if seed_parameter not in signature.parameters:
+        parameter_names = frozenset(signature.parameters)
+        for parameter in (
+            directory_parameter,
+            subdirectory_name_parameter,
+            directory_injection_parameter,
+            seed_parameter,
+        ):
+            if parameter is not None and parameter not in parameter_names:
                 raise ValueError(
-                    f"No such parameter '{seed_parameter}' for function "
+                    f"No such parameter '{parameter}' for function "
                     f"'{function.__name__}'."
                 )
+        if directory_parameter is not None:
+            output_dir_parameter_loc = cast(str, directory_parameter)
+        has_injection_parameter = directory_injection_parameter is not None
+        if has_injection_parameter:
+            injection_parameter_loc = cast(str, directory_injection_parameter)
+
+        # Parameter into which the final output directory is injected, if any,
+        # and whether only the name of the directory is injected
+        directory_target: Optional[str] = None
+        inject_directory_name = False
+        if has_injection_parameter:
+            directory_target = directory_injection_parameter
+        elif include_uuid or include_timestamp:
+            # Inject the parameter into whatever defined it
+            if subdirectory_name_parameter is not None:
+                directory_target = subdirectory_name_parameter
+                inject_directory_name = True
+            else:
+                directory_target = directory_parameter
+
+        # Parameters whose values may be altered by the decorator
+        injected_parameter_names = tuple(
+            name for name in (seed_parameter, directory_target)
+            if name is not None
+        )
+
+        # If all parameters may be passed positionally or by keyword,
+        # arguments can be bound more quickly than by the signature
+        use_fast_binding = all(
+            p.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD
+            for p in signature.parameters.values()
+        )
+        ordered_parameter_names = tuple(signature.parameters)
+        defaults = {
+            name: p.default
+            for name, p in signature.parameters.items()
+            if p.default is not inspect.Parameter.empty
+        }
 
         # Get information about source file to track the function
         try:
@@ -695,7 +1465,14 @@ def tracked(
         except TypeError:
             source_file = None
 
-        # Git information about the file in which the function is defined
+        # Static information about the called function
+        called_function_info = {
+            'name': function.__name__,
+            'module': function.__module__,
+            'source_file': source_file,
+        }
+
+        # Module in which the function is defined, for git tracking
         if not disable_git_tracking:
             module = inspect.getmodule(function)
             if module is None:
@@ -703,122 +1480,162 @@ def tracked(
                     'Could not determine module for the decorated '
                     'function.'
                 )
-            git_info = get_git_info(
-                module,
-                allow_dirty=allow_dirty_repo
-            )
-
-        # Git info on other requested modules
-        if extra_modules is not None:
-            extra_modules_git_info = {
-                m if isinstance(m, str) else m.__name__: get_git_info(
-                    m,
-                    allow_dirty=allow_dirty_repo
-                )
-                for m in extra_modules
-            }
+            tracked_module: ModuleType = module
 
         # Get (static) environment information assumed not to change between
         # invocations
         environment_info = get_environment_info()
 
-        # Get list of packages, assumed not to change between calls
-        if include_package_inventory:
-            package_inventory = get_installed_packages()
-
-        record_name_local = (
+        # Record file name, with the .json extension. Paths are handled as
+        # strings within the wrapper, avoiding the overhead of creating Path
+        # objects on every call
+        record_name_path = Path(
             record_filename or f'{function.__name__}_record'
         )
+        if not record_name_path.name.endswith('.json'):
+            record_name_path = record_name_path.with_name(
+                record_name_path.stem + '.json'
+            )
+        record_name_local = str(record_name_path)
+
+        # Only one of include_timestamp and include_uuid may be set (checked
+        # above), so at most one suffix is appended to the directory
+        include_suffix = include_timestamp or include_uuid
+
+        literal_record_dir = (
+            None if literal_directory is None
+            else os.fspath(literal_directory)
+        )
 
         # The actual wrapped function
         @functools.wraps(function)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            record: Dict[str, Any] = {}
-
             # UUID to identify this run
-            job_uuid = uuid4()
-            record['uuid'] = str(job_uuid)
+            job_uuid = _uuid4_str()
 
             start_time = datetime.datetime.now()
-            record['timing'] = {
-                'start_time': str(start_time)
-            }
 
-            # Add in copy of environment info
-            record['environment'] = deepcopy(environment_info)
+            # Add in copy of environment info. The lists are references to
+            # the live sys.argv and sys.path, so they are copied to capture
+            # their values at the time of the call
+            environment = dict(environment_info)
+            for key in ('argv', 'orig_argv', 'python_path'):
+                if key in environment_info:
+                    environment[key] = list(environment_info[key])
 
             # Environment variables could in principle change between different
             # invocations of the function (though probably shouldn't...)
             # To be safe, they are gathered every time
-            record['environment'][
-                'environment_variables'
-            ] = get_environment_vars(
+            environment['environment_variables'] = get_environment_vars(
                 extra_environment_variables=extra_environment_variables
             )
 
+            # The remaining sections are added in the order in which they
+            # appear in the record file
+            record: Dict[str, Any] = {
+                'uuid': job_uuid,
+                'timing': {
+                    'start_time': str(start_time)
+                },
+                'environment': environment,
+            }
+
+            # List of packages, assumed not to change between calls. This is
+            # gathered upon the first call rather than at decoration time to
+            # avoid slowing down imports of modules with tracked functions
             if include_package_inventory:
-                record['package_inventory'] = package_inventory
+                record['package_inventory'] = _get_installed_packages_cached()
 
             # Information about the called function
-            try:
-                bound_args = signature.bind(*args, **kwargs)
-            except TypeError:
-                # If the parameter is marked for injection but was not passed
-                # need to manually inject a value (None) here for binding to
-                # work
-                if directory_injection_parameter is not None:
-                    kwargs[directory_injection_parameter] = None
+            fast_arguments = (
+                _bind_arguments(
+                    ordered_parameter_names,
+                    defaults,
+                    args,
+                    kwargs,
+                )
+                if use_fast_binding else None
+            )
+            if fast_arguments is not None:
+                bound_args = inspect.BoundArguments(signature, fast_arguments)
+            else:
+                try:
                     bound_args = signature.bind(*args, **kwargs)
-                else:
-                    raise
-            bound_args.apply_defaults()
+                except TypeError:
+                    # If the parameter is marked for injection but was not
+                    # passed need to manually inject a value (None) here for
+                    # binding to work
+                    if has_injection_parameter:
+                        kwargs[injection_parameter_loc] = None
+                        bound_args = signature.bind(*args, **kwargs)
+                    else:
+                        raise
+                bound_args.apply_defaults()
+            arguments = bound_args.arguments
             record['called_function'] = {
-                'name': function.__name__,
-                'module': function.__module__,
-                'source_file': source_file,
+                **called_function_info,
                 'parameters': {
                     k: _format_json(v, 200)
-                    for k, v in bound_args.arguments.items()
+                    for k, v in arguments.items()
                 }
             }
 
+            # Git information is gathered upon the first call rather than at
+            # decoration time as it requires calling git, and is cached for
+            # subsequent calls
             if not disable_git_tracking:
-                record['tracked_module'] = git_info
+                record['tracked_module'] = get_git_info(
+                    tracked_module,
+                    allow_dirty=allow_dirty_repo
+                )
             if extra_modules is not None:
-                record['extra_tracked_modules'] = extra_modules_git_info
+                record['extra_tracked_modules'] = {
+                    m if isinstance(m, str) else m.__name__: get_git_info(
+                        m,
+                        allow_dirty=allow_dirty_repo
+                    )
+                    for m in extra_modules
+                }
 
-            if literal_directory is not None:
-                record_dir = Path(literal_directory)
+            if literal_record_dir is not None:
+                record_dir = literal_record_dir
             else:
                 # Mypy can't figure out that this must be non-None due to
                 # earlier checks
-                record_dir = Path(
-                    bound_args.arguments[output_dir_parameter_loc]
-                )
+                record_dir = os.fspath(arguments[output_dir_parameter_loc])
 
             if subdirectory_name_parameter is not None:
-                record_dir.mkdir(exist_ok=True, parents=create_parents)
-                subdir_name = bound_args.arguments[subdirectory_name_parameter]
-
-                record_dir /= subdir_name
-
-            if include_timestamp:
-                timestamp = start_time.strftime(_TIMESTAMP_FMT)
-                new_name = f'{record_dir.name}_{timestamp}'
-                record_dir = record_dir.resolve().with_name(new_name)
-            elif include_uuid:
-                new_name = f'{record_dir.name}_{job_uuid}'
-                record_dir = record_dir.resolve().with_name(new_name)
+                _make_directory(record_dir, create_parents)
+                subdir_name = arguments[subdirectory_name_parameter]
+
+                record_dir = os.path.join(record_dir, subdir_name)
+
+            # The path is made absolute (and normalized, so that it has a
+            # final component to rename) without resolving symlinks, which
+            # requires a system call for every component
+            if include_suffix:
+                suffix = (
+                    start_time.strftime(_TIMESTAMP_FMT) if include_timestamp
+                    else job_uuid
+                )
+                parent, name = os.path.split(os.path.abspath(record_dir))
+                record_dir = os.path.join(parent, name + '_' + suffix)
 
             seed: Optional[int] = None
             if seed_parameter is not None:
-                seed_ = bound_args.arguments[seed_parameter]
-                if not isinstance(seed_, int) and seed_ is not None:
+                seed_ = arguments[seed_parameter]
+                # The exact type is compared first, as it is much cheaper
+                # than isinstance in the common case of a plain int
+                if (
+                    seed_ is not None and  # noqa: W504
+                    type(seed_) is not int and  # noqa: W504
+                    not isinstance(seed_, int)
+                ):
                     raise TypeError(
-                        "Value of the seed parameter must be 'int' or 'None'"
+                        "Value of the seed parameter must be 'int' or 'None' "
                         f"but got type {type(seed_)} for parameter "
-                        "'{seed_parameter}' of function "
-                        "'{function.__name__}'."
+                        f"'{seed_parameter}' of function "
+                        f"'{function.__name__}'."
                     )
                 seed = seed_
             seed = seed_tasks(seed, seed_numpy, seed_tensorflow, seed_torch)
@@ -826,67 +1643,66 @@ def tracked(
 
             # Inject the seed parameter
             if seed_parameter is not None:
-                bound_args.arguments[seed_parameter] = seed
+                arguments[seed_parameter] = seed
 
             # Inject the final output directory
-            if directory_injection_parameter is not None:
-                bound_args.arguments[
-                    directory_injection_parameter
-                ] = record_dir
-            elif include_uuid or include_timestamp:
-                # Inject the parameter into whatever defined it
-                if subdirectory_name_parameter is not None:
-                    bound_args.arguments[subdirectory_name_parameter] = (
-                        record_dir.name
-                    )
-                else:
-                    if directory_parameter is not None:
-                        bound_args.arguments[directory_parameter] = record_dir
+            if directory_target is not None:
+                injected_dir = Path(record_dir)
+                arguments[directory_target] = (
+                    injected_dir.name if inject_directory_name
+                    else injected_dir
+                )
 
-            record_dir.mkdir(exist_ok=True, parents=create_parents)
+            # Directories with a timestamp or UUID are unique to this call,
+            # so there is no point remembering them. Directories required to
+            # be empty are checked on every call anyway
+            _make_directory(
+                record_dir,
+                create_parents,
+                remember=not (include_suffix or require_empty_directory),
+            )
             if require_empty_directory:
-                i = record_dir.iterdir()
-                try:
-                    next(i)
-                except StopIteration:
-                    # Directory is empty
-                    pass
-                else:
+                # Only the first entry is needed to know that the directory
+                # is not empty
+                with os.scandir(record_dir) as entries:
+                    is_empty = next(entries, None) is None
+                if not is_empty:
                     raise FileExistsError(
                         f"Directory {record_dir} is not empty."
                     )
 
-            # Record parameters that are actually used to call the function
-            record['called_function']['altered_parameters'] = {
-                k: _format_json(v, 200)
-                for k, v in bound_args.arguments.items()
-            }
-
-            full_record_path = record_dir / record_name_local
-
-            if not full_record_path.name.endswith(".json"):
-                full_record_path = full_record_path.with_name(
-                    full_record_path.stem + ".json"
-                )
-
-            chaining = False
-            if chain_records:
-                if full_record_path.exists():
-                    chaining = True
-                    with full_record_path.open("r") as jf:
-                        previous_record = json.load(jf)
+            # Record parameters that are actually used to call the function.
+            # Only the injected parameters can differ from the original ones,
+            # so only these need to be formatted again. Without any, the
+            # formatted parameters are shared rather than copied
+            altered_parameters = record['called_function']['parameters']
+            if injected_parameter_names:
+                altered_parameters = dict(altered_parameters)
+                for name in injected_parameter_names:
+                    altered_parameters[name] = _format_json(
+                        arguments[name],
+                        200
+                    )
+            record['called_function']['altered_parameters'] = (
+                altered_parameters
+            )
 
-                    if isinstance(previous_record, List):
-                        out_record = previous_record + [record]
+            full_record_path = os.path.join(record_dir, record_name_local)
 
-                    else:
-                        out_record = [previous_record, record]
-                else:
-                    out_record = record
-            else:
-                out_record = record
-
-            write_record(full_record_path, record=out_record)
+            # The record is written before the function is run, so that it is
+            # available while the function is running and if it fails. If the
+            # directory was required to be empty, it has already been found to
+            # contain no previous record
+            chain = chain_records and not require_empty_directory
+            try:
+                _save_record(full_record_path, record, chain)
+            except FileNotFoundError:
+                # The directory was removed after it was created by an
+                # earlier call. Its parents were created again above, if
+                # needed
+                _forget_directory(record_dir)
+                _make_directory(record_dir, create_parents)
+                _save_record(full_record_path, record, chain)
 
             # Run the function as normal
             result = function(*bound_args.args, **bound_args.kwargs)
@@ -896,17 +1712,7 @@ def tracked(
             record['timing']['end_time'] = str(end_time)
             record['timing']['run_time'] = str(end_time - start_time)
 
-            if chaining:
-                if isinstance(previous_record, List):
-                    out_record = previous_record + [record]
-
-                else:
-                    out_record = [previous_record, record]
-
-            else:
-                out_record = record
-
-            write_record(full_record_path, record=out_record)
+            _save_record(full_record_path, record, chain)
 
             return result
 
@@ -0,0 +1,25 @@
+"""Configuration of the tests for the pycrumbs package."""
+from pycrumbs import track
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """Add command line options for the tests."""
+    parser.addoption(
+        '--no-git-cache',
+        action='store_true',
+        default=False,
+        help=(
+            'Clear the cached git information before each test, such that '
+            'git is run again by every test that uses it.'
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def git_cache(request):
+    """Clear the cached git information if requested on the command line."""
+    if request.config.getoption('--no-git-cache'):
+        track._get_git_info_cached.cache_clear()
+    yield
@@ -1,10 +1,17 @@
 """Tests for the pycrumbs.track module."""
 from datetime import datetime
+import functools
+import inspect
 import json
+import math
+import shutil
+import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
-import tempfile
-from uuid import uuid4
-from typing import Dict, List
+from uuid import RFC_4122, UUID, uuid4
+from typing import Any, Dict, List
 
 import pycrumbs
 from pycrumbs import track
@@ -12,11 +19,64 @@ from pycrumbs import track
 import pytest
 
 
+# Git tracking is tested separately, and is disabled elsewhere so that the
+# remaining tests do not depend on the state of the repository
+tracked = functools.partial(pycrumbs.tracked, disable_git_tracking=True)
+
+
+def load_record(path: Path) -> Any:
+    """Load the contents of a saved record file."""
+    return json.loads(path.read_bytes())
+
+
+def assert_common(record_data: Dict[str, Any]) -> None:
+    """Check the entries that every completed record should contain."""
+    assert 'seed' in record_data
+    assert 'start_time' in record_data['timing']
+    assert 'end_time' in record_data['timing']
+    assert 'run_time' in record_data['timing']
+
+
 def reformat_time(time: str) -> str:
     """Reformat time string saved in record to one used in directory name."""
     return datetime.fromisoformat(time).strftime(track._TIMESTAMP_FMT)
 
 
+@tracked(directory_parameter='path')
+def add_one(x, path):
+    """Add one to a number, placing the record in the given directory."""
+    return x + 1
+
+
+# Name of the record file of the functions named 'some_fun'
+RECORD_NAME = 'some_fun_record.json'
+
+SUFFIX_OPTIONS = ['include_timestamp', 'include_uuid']
+
+# A parameter value that cannot be serialized to JSON
+NON_SERIALIZABLE_PARAM = uuid4()
+
+# A parameter value whose representation is too long to be recorded
+LONG_PARAM = list(range(1000))
+
+
+def expected_suffix(record_data: Dict[str, Any], suffix_option: str) -> str:
+    """Get the output directory suffix expected for a saved record."""
+    if suffix_option == 'include_timestamp':
+        return reformat_time(record_data['timing']['start_time'])
+    return record_data['uuid']
+
+
+def test_uuid4_str():
+    """Test _uuid4_str generates valid version 4 UUIDs."""
+    value = track._uuid4_str()
+    uuid = UUID(value)
+    assert str(uuid) == value
+    assert uuid.version == 4
+    assert uuid.variant == RFC_4122
+    assert track._uuid4_str() != value
+
+
 def test_records_self_object():
     """Test get_git_info with the pycrumbs module object."""
     record = pycrumbs.get_git_info(pycrumbs)
@@ -33,789 +93,833 @@ def test_records_self_name():
     assert 'git_is_dirty' in record
 
 
+def test_records_self_gitpython_fallback(monkeypatch):
+    """Test get_git_info falls back to GitPython if git cannot be run."""
+    record = pycrumbs.get_git_info(pycrumbs, allow_dirty=True)
+
+    def no_git(*args, **kwargs):
+        raise FileNotFoundError('git')
+
+    monkeypatch.setattr(track, '_run_git', no_git)
+    track._get_git_info_cached.cache_clear()
+    try:
+        fallback_record = pycrumbs.get_git_info(pycrumbs, allow_dirty=True)
+    finally:
+        track._get_git_info_cached.cache_clear()
+    assert fallback_record == record
+
+
+def test_records_self_cached(monkeypatch):
+    """Test get_git_info does not run git again for the same module."""
+    record = pycrumbs.get_git_info(pycrumbs, allow_dirty=True)
+
+    def no_git(*args, **kwargs):
+        raise AssertionError('git should not be run for a cached module')
+
+    monkeypatch.setattr(track, '_run_git', no_git)
+    assert pycrumbs.get_git_info(pycrumbs, allow_dirty=True) == record
+
+
+def test_records_dirty_after_cached(tmp_path, monkeypatch):
+    """Test get_git_info finds a repository that became dirty after caching."""
+    module_file = tmp_path / 'dirty_after_cached.py'
+    module_file.write_text('x = 1\n')
+    git = ['git', '-C', str(tmp_path)]
+    subprocess.run([*git, 'init', '-q'], check=True)
+    subprocess.run([*git, 'add', module_file.name], check=True)
+    subprocess.run(
+        [
+            *git, '-c', 'user.name=test', '-c', 'user.email=test@test',
+            'commit', '-q', '-m', 'Add module',
+        ],
+        check=True,
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    record = pycrumbs.get_git_info('dirty_after_cached')
+    assert not record['git_is_dirty']
+
+    module_file.write_text('x = 2\n')
+    with pytest.raises(RuntimeError):
+        pycrumbs.get_git_info('dirty_after_cached')
+
+
 def test_records_standard_library():
     """Test get_git_info with a standard library module."""
     with pytest.raises(RuntimeError):
         pycrumbs.get_git_info('os')
 
 
-def test_auto_wrap_literal():
+def test_write_record(tmp_path):
+    """Test write_record adds the extension and writes loadable JSON."""
+    record = {
+        'uuid': str(uuid4()),
+        'seed': 2 ** 70,
+        'nested': {'values': [1, 2.5, None, 'text']},
+    }
+    pycrumbs.write_record(tmp_path / 'my_record', record)
+    assert list(tmp_path.iterdir()) == [tmp_path / 'my_record.json']
+    assert load_record(tmp_path / 'my_record.json') == record
+
+
+def test_dump_json_fallback_layout(monkeypatch):
+    """Test the standard library fallback writes the same layout as orjson."""
+    record = {'uuid': str(uuid4()), 'timing': {'start_time': 'now'}}
+    dumped = track._dump_json([record])
+    monkeypatch.setattr(track, '_have_orjson', False)
+    assert track._dump_json([record]) == dumped
+
+
+def test_non_finite_parameter(tmp_path):
+    """Test tracked records non-finite float parameters as such."""
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x, patience=float('inf')):
+        pass
+
+    some_fun(float('nan'))
+    record_data = load_record(tmp_path / RECORD_NAME)
+    parameters = record_data['called_function']['parameters']
+    assert math.isnan(parameters['x'])
+    assert parameters['patience'] == float('inf')
+
+
+def test_auto_wrap_literal(tmp_path):
     """Test tracked with a literal output path."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp)
-        def some_fun(x):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {'x': 4}
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_literal_with_timestamp():
-    """Test tracked with a literal output path with timestamp."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        subdir = temp / 'subdir'
-
-        @pycrumbs.tracked(
-            literal_directory=subdir,
-            include_timestamp=True,
-            directory_injection_parameter='literal_directory',
-        )
-        def some_fun(x, literal_directory=None):
-            assert isinstance(literal_directory, Path)
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = outdir.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        assert outdir.name.startswith('subdir_')
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {
-            'x': 4,
-            'literal_directory': None
-        }
-        assert record_data['called_function']['altered_parameters'] == {
-            'x': 4,
-            'literal_directory': repr(outdir)
-        }
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        expected_time = reformat_time(record_data['timing']['start_time'])
-        assert outdir.name.endswith(expected_time)
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_literal_with_uuid():
-    """Test tracked with a literal output path and a uuid."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir = temp / 'subdir'
-
-        @pycrumbs.tracked(
-            literal_directory=subdir,
-            include_uuid=True,
-            directory_injection_parameter='literal_directory',
-        )
-        def some_fun(x, literal_directory=None):
-            assert isinstance(literal_directory, Path)
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = outdir.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        assert outdir.name.startswith('subdir_')
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {
-            'x': 4,
-            'literal_directory': None
-        }
-        assert record_data['called_function']['altered_parameters'] == {
-            'x': 4,
-            'literal_directory': repr(outdir)
-        }
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert outdir.name.endswith(record_data['uuid'])
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_literal_injecting_required_parameter():
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x):
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 5
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    assert record_data['called_function']['parameters'] == {'x': 4}
+    assert_common(record_data)
+
+
+@pytest.mark.parametrize('suffix_option', SUFFIX_OPTIONS)
+def test_auto_wrap_literal_with_suffix(suffix_option, tmp_path):
+    """Test tracked with a literal output path with timestamp or uuid."""
+    subdir = tmp_path / 'subdir'
+
+    @tracked(
+        literal_directory=subdir,
+        directory_injection_parameter='literal_directory',
+        **{suffix_option: True},
+    )
+    def some_fun(x, literal_directory=None):
+        assert isinstance(literal_directory, Path)
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 5
+    (outdir,) = tmp_path.glob('subdir_*')
+    saved_record = outdir / RECORD_NAME
+    assert saved_record.exists()
+    assert outdir.name.startswith('subdir_')
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    assert record_data['called_function']['parameters'] == {
+        'x': 4,
+        'literal_directory': None
+    }
+    assert record_data['called_function']['altered_parameters'] == {
+        'x': 4,
+        'literal_directory': repr(outdir)
+    }
+    assert_common(record_data)
+    assert outdir.name.endswith(
+        expected_suffix(record_data, suffix_option)
+    )
+
+
+def test_auto_wrap_literal_injecting_required_parameter(tmp_path):
     """Test tracked when injecting into a required parameter."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir = temp / 'subdir'
-
-        @pycrumbs.tracked(
-            literal_directory=subdir,
-            include_uuid=True,
-            directory_injection_parameter='literal_directory',
-        )
-        def some_fun(x, literal_directory):
-            assert isinstance(literal_directory, Path)
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = outdir.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        assert outdir.name.startswith('subdir_')
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {
-            'x': 4,
-            'literal_directory': None
-        }
-        assert record_data['called_function']['altered_parameters'] == {
-            'x': 4,
-            'literal_directory': repr(outdir)
-        }
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert outdir.name.endswith(record_data['uuid'])
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_literal_subdir():
+    subdir = tmp_path / 'subdir'
+
+    @tracked(
+        literal_directory=subdir,
+        include_uuid=True,
+        directory_injection_parameter='literal_directory',
+    )
+    def some_fun(x, literal_directory):
+        assert isinstance(literal_directory, Path)
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 5
+    (outdir,) = tmp_path.glob('subdir_*')
+    saved_record = outdir / RECORD_NAME
+    assert saved_record.exists()
+    assert outdir.name.startswith('subdir_')
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    assert record_data['called_function']['parameters'] == {
+        'x': 4,
+        'literal_directory': None
+    }
+    assert record_data['called_function']['altered_parameters'] == {
+        'x': 4,
+        'literal_directory': repr(outdir)
+    }
+    assert_common(record_data)
+    assert outdir.name.endswith(record_data['uuid'])
+
+
+def test_auto_wrap_literal_subdir(tmp_path):
     """Test tracked with a sub-directory."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir_name = 'my_model'
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            subdirectory_name_parameter='model_name'
-        )
-        def some_fun(x, model_name):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, model_name=subdir_name)
-        assert y == 5
-        saved_record = temp.joinpath(subdir_name, 'some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'model_name': subdir_name}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_dir_param_with_timestamp():
+    subdir_name = 'my_model'
+
+    @tracked(
+        literal_directory=tmp_path,
+        subdirectory_name_parameter='model_name'
+    )
+    def some_fun(x, model_name):
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4, model_name=subdir_name)
+    assert y == 5
+    saved_record = tmp_path / subdir_name / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4, 'model_name': subdir_name}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_dir_param_with_timestamp(tmp_path):
     """Test tracked with a directory parameter and a timestamp."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir_name = 'my_model'
-
-        @pycrumbs.tracked(
-            directory_parameter='literal_directory',
-            include_timestamp=True,
-        )
-        def some_fun(x, literal_directory):
-            assert literal_directory.name.startswith(subdir_name)
-            assert len(literal_directory.name) > len(subdir_name)
-            return x + 1
-
-        initial_output_dir = temp / subdir_name
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, literal_directory=initial_output_dir)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = temp.joinpath(outdir, 'some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'literal_directory': repr(initial_output_dir)}
-        assert record_data['called_function']['parameters'] == params_dict
-        alt_dict = {
-            'x': 4,
-            'literal_directory': repr(outdir),
-        }
-        assert (
-            record_data['called_function']['altered_parameters'] == alt_dict
-        )
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-        assert outdir.name.startswith(subdir_name + '_')
-
-
-def test_auto_wrap_subdir_with_timestamp():
-    """Test tracked with a sub-directory and a timestamp."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir_name = 'my_model'
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            subdirectory_name_parameter='model_name',
-            include_timestamp=True,
-        )
-        def some_fun(x, model_name):
-            assert model_name.startswith(subdir_name)
-            assert len(model_name) > len(subdir_name)
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, model_name=subdir_name)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = temp.joinpath(outdir, 'some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'model_name': subdir_name}
-        assert record_data['called_function']['parameters'] == params_dict
-        alt_dict = {
-            'x': 4,
-            'model_name': outdir.name,
-        }
-        assert (
-            record_data['called_function']['altered_parameters'] == alt_dict
-        )
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-        assert outdir.name.startswith(subdir_name + '_')
-
-
-def test_auto_wrap_subdir_with_timestamp_inject():
-    """Test tracked with a sub-directory and a timestamp."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir_name = 'my_model'
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            subdirectory_name_parameter='model_name',
-            include_timestamp=True,
-            directory_injection_parameter='literal_directory',
-        )
-        def some_fun(x, model_name, literal_directory=None):
-            assert isinstance(literal_directory, Path)
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, model_name=subdir_name)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = temp.joinpath(outdir, 'some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'model_name': subdir_name, 'literal_directory': None}
-        assert record_data['called_function']['parameters'] == params_dict
-        alt_dict = {
-            'x': 4,
-            'model_name': subdir_name,
-            'literal_directory': repr(outdir)
-        }
-        assert (
-            record_data['called_function']['altered_parameters'] == alt_dict
-        )
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-        assert outdir.name.startswith(subdir_name + '_')
-        expected_time = reformat_time(record_data['timing']['start_time'])
-        assert outdir.name.endswith(expected_time)
-
-
-def test_auto_wrap_subdir_with_uuid():
-    """Test tracked with a sub-directory and a uuid."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir_name = 'my_model'
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            subdirectory_name_parameter='model_name',
-            include_uuid=True,
-        )
-        def some_fun(x, model_name):
-            assert model_name.startswith(subdir_name)
-            assert len(model_name) > len(subdir_name)
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, model_name=subdir_name)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = temp.joinpath(outdir, 'some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'model_name': subdir_name}
-        assert record_data['called_function']['parameters'] == params_dict
-        alt_dict = {
-            'x': 4,
-            'model_name': outdir.name,
-        }
-        assert (
-            record_data['called_function']['altered_parameters'] == alt_dict
-        )
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-        assert outdir.name.startswith(subdir_name + '_')
-        assert outdir.name.endswith(record_data['uuid'])
-
-
-def test_auto_wrap_subdir_with_uuid_and_inject():
-    """Test tracked with a sub-directory and a uuid."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir_name = 'my_model'
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            subdirectory_name_parameter='model_name',
-            include_uuid=True,
-            directory_injection_parameter='literal_directory',
-        )
-        def some_fun(x, model_name, literal_directory=None):
-            assert isinstance(literal_directory, Path)
-            assert model_name == subdir_name
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, model_name=subdir_name)
-        assert y == 5
-        outdir = next(temp.iterdir())
-        saved_record = temp.joinpath(outdir, 'some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'model_name': subdir_name, 'literal_directory': None}
-        assert record_data['called_function']['parameters'] == params_dict
-        alt_dict = {
-            'x': 4,
-            'model_name': subdir_name,
-            'literal_directory': repr(outdir)
-        }
-        assert (
-            record_data['called_function']['altered_parameters'] == alt_dict
-        )
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-        assert outdir.name.startswith(subdir_name + '_')
-        assert outdir.name.endswith(record_data['uuid'])
-
-
-def test_auto_wrap_literal_record_name():
+    subdir_name = 'my_model'
+
+    @tracked(
+        directory_parameter='literal_directory',
+        include_timestamp=True,
+    )
+    def some_fun(x, literal_directory):
+        assert literal_directory.name.startswith(subdir_name)
+        assert len(literal_directory.name) > len(subdir_name)
+        return x + 1
+
+    initial_output_dir = tmp_path / subdir_name
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4, literal_directory=initial_output_dir)
+    assert y == 5
+    (outdir,) = tmp_path.glob(subdir_name + '_*')
+    saved_record = outdir / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4, 'literal_directory': repr(initial_output_dir)}
+    assert record_data['called_function']['parameters'] == params_dict
+    alt_dict = {
+        'x': 4,
+        'literal_directory': repr(outdir),
+    }
+    assert (
+        record_data['called_function']['altered_parameters'] == alt_dict
+    )
+    assert_common(record_data)
+    assert outdir.name.startswith(subdir_name + '_')
+
+
+@pytest.mark.parametrize('suffix_option', SUFFIX_OPTIONS)
+def test_auto_wrap_subdir_with_suffix(suffix_option, tmp_path):
+    """Test tracked with a sub-directory and a timestamp or uuid."""
+    subdir_name = 'my_model'
+
+    @tracked(
+        literal_directory=tmp_path,
+        subdirectory_name_parameter='model_name',
+        **{suffix_option: True},
+    )
+    def some_fun(x, model_name):
+        assert model_name.startswith(subdir_name)
+        assert len(model_name) > len(subdir_name)
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4, model_name=subdir_name)
+    assert y == 5
+    (outdir,) = tmp_path.glob(subdir_name + '_*')
+    saved_record = outdir / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4, 'model_name': subdir_name}
+    assert record_data['called_function']['parameters'] == params_dict
+    alt_dict = {
+        'x': 4,
+        'model_name': outdir.name,
+    }
+    assert (
+        record_data['called_function']['altered_parameters'] == alt_dict
+    )
+    assert_common(record_data)
+    assert outdir.name.startswith(subdir_name + '_')
+    assert outdir.name.endswith(
+        expected_suffix(record_data, suffix_option)
+    )
+
+
+@pytest.mark.parametrize('suffix_option', SUFFIX_OPTIONS)
+def test_auto_wrap_subdir_with_suffix_inject(suffix_option, tmp_path):
+    """Test tracked with a sub-directory, a suffix and an injected path."""
+    subdir_name = 'my_model'
+
+    @tracked(
+        literal_directory=tmp_path,
+        subdirectory_name_parameter='model_name',
+        directory_injection_parameter='literal_directory',
+        **{suffix_option: True},
+    )
+    def some_fun(x, model_name, literal_directory=None):
+        assert isinstance(literal_directory, Path)
+        assert model_name == subdir_name
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4, model_name=subdir_name)
+    assert y == 5
+    (outdir,) = tmp_path.glob(subdir_name + '_*')
+    saved_record = outdir / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {
+        'x': 4,
+        'model_name': subdir_name,
+        'literal_directory': None,
+    }
+    assert record_data['called_function']['parameters'] == params_dict
+    alt_dict = {
+        'x': 4,
+        'model_name': subdir_name,
+        'literal_directory': repr(outdir)
+    }
+    assert (
+        record_data['called_function']['altered_parameters'] == alt_dict
+    )
+    assert_common(record_data)
+    assert outdir.name.startswith(subdir_name + '_')
+    assert outdir.name.endswith(
+        expected_suffix(record_data, suffix_option)
+    )
+
+
+def test_auto_wrap_literal_record_name(tmp_path):
     """Test tracked with an alternative record name."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        record_filename = 'my_record'
-
-        @pycrumbs.tracked(literal_directory=temp, record_filename=record_filename)
-        def some_fun(x):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        saved_record = temp.joinpath(f'{record_filename}.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {'x': 4}
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_arg_extra_modules_string():
+    record_filename = 'my_record'
+
+    @tracked(
+        literal_directory=tmp_path,
+        record_filename=record_filename,
+    )
+    def some_fun(x):
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 5
+    saved_record = tmp_path / f'{record_filename}.json'
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    assert record_data['called_function']['parameters'] == {'x': 4}
+    assert_common(record_data)
+
+
+def test_auto_wrap_arg_extra_modules_string(tmp_path):
     """Test tracked with extra modules as strings."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            extra_modules=['pycrumbs']
-        )
-        def some_fun(x):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {'x': 4}
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_arg_extra_modules_object():
+    @tracked(
+        literal_directory=tmp_path,
+        extra_modules=['pycrumbs']
+    )
+    def some_fun(x):
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 5
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    assert record_data['called_function']['parameters'] == {'x': 4}
+    assert_common(record_data)
+
+
+def test_auto_wrap_arg_extra_modules_object(tmp_path):
     """Test tracked with extra modules as objects."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(
-            literal_directory=temp,
-            extra_modules=[pycrumbs]
-        )
-        def some_fun(x):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 5
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        assert record_data['called_function']['parameters'] == {'x': 4}
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_arg():
+    @tracked(
+        literal_directory=tmp_path,
+        extra_modules=[pycrumbs]
+    )
+    def some_fun(x):
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 5
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    assert record_data['called_function']['parameters'] == {'x': 4}
+    assert_common(record_data)
+
+
+def test_auto_wrap_arg(tmp_path):
     """Test tracked intercepting output location parameter as an arg."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(directory_parameter='path')
-        def some_fun(x, path):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, temp)
-        assert y == 5
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'path': repr(temp)}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_kwarg():
+    assert add_one.__name__ == 'add_one'
+    y = add_one(4, tmp_path)
+    assert y == 5
+    saved_record = tmp_path / 'add_one_record.json'
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'add_one'
+    params_dict = {'x': 4, 'path': repr(tmp_path)}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_kwarg(tmp_path):
     """Test tracked intercepting output location parameter as a kwarg."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(directory_parameter='path')
-        def some_fun(x, path):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, path=temp)  # 'path' is a kwarg
-        assert y == 5
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'path': repr(temp)}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_default():
+    assert add_one.__name__ == 'add_one'
+    y = add_one(4, path=tmp_path)  # 'path' is a kwarg
+    assert y == 5
+    saved_record = tmp_path / 'add_one_record.json'
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'add_one'
+    params_dict = {'x': 4, 'path': repr(tmp_path)}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_default(tmp_path):
     """Test tracked intercepting output location as a default arg."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(directory_parameter='path')
-        def some_fun(x, path=temp):
-            return x + 1
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)  # 'path' takes default value
-        assert y == 5
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'path': repr(temp)}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_args_sig():
+    @tracked(directory_parameter='path')
+    def some_fun(x, path=tmp_path):
+        return x + 1
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)  # 'path' takes default value
+    assert y == 5
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4, 'path': repr(tmp_path)}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_args_sig(tmp_path):
     """Test tracked with a function defined with *args."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp)
-        def some_fun(*args):
-            return args
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4, 5, 6)
-        assert y == (4, 5, 6)
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'args': [4, 5, 6]}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_args_kwargs_sig():
+    @tracked(literal_directory=tmp_path)
+    def some_fun(*args):
+        return args
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4, 5, 6)
+    assert y == (4, 5, 6)
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'args': [4, 5, 6]}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_args_kwargs_sig(tmp_path):
     """Test tracked with a function defined with *args."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp)
-        def some_fun(*args, **kwargs):
-            return args, kwargs
-
-        assert some_fun.__name__ == 'some_fun'
-        out_args, out_kwargs = some_fun(4, 5, thing='frog')
-        assert out_args == (4, 5)
-        assert out_kwargs == {'thing': 'frog'}
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'args': [4, 5], 'kwargs': {'thing': 'frog'}}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_seed():
+    @tracked(literal_directory=tmp_path)
+    def some_fun(*args, **kwargs):
+        return args, kwargs
+
+    assert some_fun.__name__ == 'some_fun'
+    out_args, out_kwargs = some_fun(4, 5, thing='frog')
+    assert out_args == (4, 5)
+    assert out_kwargs == {'thing': 'frog'}
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'args': [4, 5], 'kwargs': {'thing': 'frog'}}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_signature_once(tmp_path, monkeypatch):
+    """Test tracked inspects the signature only when decorating."""
+    signature_calls = []
+    signature = inspect.signature
+
+    def counting_signature(*args, **kwargs):
+        signature_calls.append(args)
+        return signature(*args, **kwargs)
+
+    monkeypatch.setattr(inspect, 'signature', counting_signature)
+
+    @tracked(literal_directory=tmp_path, seed_parameter='seed')
+    def some_fun(x, *args, seed=None):
+        return x + 1
+
+    assert len(signature_calls) == 1
+    for x in range(3):
+        assert some_fun(x) == x + 1
+    assert len(signature_calls) == 1
+
+
+def test_auto_wrap_bad_arguments(tmp_path):
+    """Test tracked raises the usual errors for invalid arguments."""
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x, y=1):
+        return x + y
+
+    with pytest.raises(TypeError):
+        some_fun()
+    with pytest.raises(TypeError):
+        some_fun(1, 2, 3)
+    with pytest.raises(TypeError):
+        some_fun(1, z=2)
+    with pytest.raises(TypeError):
+        some_fun(1, x=2)
+    assert some_fun(1, y=2) == 3
+
+
+def test_auto_wrap_seed(tmp_path):
     """Test tracked with a specified seed."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        seed = 98
-
-        @pycrumbs.tracked(literal_directory=temp, seed_parameter='seed')
-        def some_fun(x, seed):
-            return x + seed
-
-        assert some_fun.__name__ == 'some_fun'
-        # Test seed as an arg and a kwarg
-        y = some_fun(4, seed)
-        assert y == 4 + seed
-        y = some_fun(4, seed=seed)
-        assert y == 4 + seed
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'seed': seed}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert record_data['seed'] == seed
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_seed_none():
+    seed = 98
+
+    @tracked(literal_directory=tmp_path, seed_parameter='seed')
+    def some_fun(x, seed):
+        return x + seed
+
+    assert some_fun.__name__ == 'some_fun'
+    # Test seed as an arg and a kwarg
+    y = some_fun(4, seed)
+    assert y == 4 + seed
+    y = some_fun(4, seed=seed)
+    assert y == 4 + seed
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4, 'seed': seed}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+    assert record_data['seed'] == seed
+
+
+def test_auto_wrap_seed_none(tmp_path):
     """Test tracked with an empty seed."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp, seed_parameter='seed')
-        def some_fun(x, seed=None):
-            return seed
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4, 'seed': None}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert isinstance(record_data['seed'], int)
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-        # Check the seed was insert correctly into the called function
-        assert y == record_data['seed']
-
-
-def test_auto_wrap_disabled_tracking():
+    @tracked(literal_directory=tmp_path, seed_parameter='seed')
+    def some_fun(x, seed=None):
+        return seed
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4, 'seed': None}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+    assert isinstance(record_data['seed'], int)
+
+    # Check the seed was insert correctly into the called function
+    assert y == record_data['seed']
+
+
+def test_seed_tasks_broken_library(tmp_path, monkeypatch):
+    """Test seed_tasks skips a library that is installed but is broken."""
+    package = tmp_path / 'torch'
+    package.mkdir()
+    (package / '__init__.py').write_text("raise ImportError('broken')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'torch', raising=False)
+    monkeypatch.setattr(track, '_have_torch', True)
+    track._get_seeders.cache_clear()
+    try:
+        assert pycrumbs.seed_tasks(5, seed_torch=True) == 5
+    finally:
+        track._get_seeders.cache_clear()
+
+
+def test_auto_wrap_seed_bad_type(tmp_path):
+    """Test tracked with a seed of the wrong type."""
+    @tracked(literal_directory=tmp_path, seed_parameter='seed')
+    def some_fun(x, seed=None):
+        return seed
+
+    with pytest.raises(TypeError, match="'seed' of function 'some_fun'"):
+        some_fun(4, seed='1')
+
+
+def test_auto_wrap_disabled_tracking(tmp_path):
     """Test tracked with no git tracking."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp, disable_git_tracking=True)
-        def some_fun(x):
-            return x
-
-        assert some_fun.__name__ == 'some_fun'
-        y = some_fun(4)
-        assert y == 4
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': 4}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-        assert 'tracked_module' not in record_data
-
-
-def test_auto_wrap_non_serializable_param():
+    @pycrumbs.tracked(literal_directory=tmp_path, disable_git_tracking=True)
+    def some_fun(x):
+        return x
+
+    assert some_fun.__name__ == 'some_fun'
+    y = some_fun(4)
+    assert y == 4
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': 4}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+    assert 'tracked_module' not in record_data
+
+
+def test_auto_wrap_git_tracking(tmp_path):
+    """Test tracked with git tracking of the module of the function."""
+    @pycrumbs.tracked(literal_directory=tmp_path)
+    def some_fun(x):
+        return x
+
+    y = some_fun(4)
+    assert y == 4
+    saved_record = tmp_path / RECORD_NAME
+    record_data = load_record(saved_record)
+    tracked_module = record_data['tracked_module']
+    assert tracked_module['name'] == __name__
+    assert tracked_module['module_path'] == __file__
+    assert 'git_commit_hash' in tracked_module
+    assert 'git_active_branch' in tracked_module
+    assert 'git_is_dirty' in tracked_module
+
+
+def test_auto_wrap_non_serializable_param(tmp_path):
     """Test tracked with a non-serializable parameter."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp)
-        def some_fun(x):
-            return x
-
-        assert some_fun.__name__ == 'some_fun'
-        x = uuid4()  # non-serializable
-        y = some_fun(x)
-        assert y == x
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': repr(x)}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_auto_wrap_long_param():
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x):
+        return x
+
+    assert some_fun.__name__ == 'some_fun'
+    x = NON_SERIALIZABLE_PARAM
+    y = some_fun(x)
+    assert y == x
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': repr(x)}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_auto_wrap_long_param(tmp_path):
     """Test tracked with a long parameter."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-
-        @pycrumbs.tracked(literal_directory=temp)
-        def some_fun(x):
-            return x
-
-        assert some_fun.__name__ == 'some_fun'
-        x = list(range(1000))  # too long
-        y = some_fun(x)
-        assert y == x
-        saved_record = temp.joinpath('some_fun_record.json')
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_data = json.load(jf)
-        assert record_data['called_function']['name'] == 'some_fun'
-        params_dict = {'x': '<suppressed due to excessive length>'}
-        assert record_data['called_function']['parameters'] == params_dict
-        assert 'seed' in record_data
-        assert 'start_time' in record_data['timing']
-        assert 'end_time' in record_data['timing']
-
-
-def test_require_empty_success():
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x):
+        return x
+
+    assert some_fun.__name__ == 'some_fun'
+    x = LONG_PARAM
+    y = some_fun(x)
+    assert y == x
+    saved_record = tmp_path / RECORD_NAME
+    assert saved_record.exists()
+    record_data = load_record(saved_record)
+    assert record_data['called_function']['name'] == 'some_fun'
+    params_dict = {'x': '<suppressed due to excessive length>'}
+    assert record_data['called_function']['parameters'] == params_dict
+    assert_common(record_data)
+
+
+def test_require_empty_success(tmp_path):
     """Test tracked with require_empty_directory is True."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
+    @tracked(literal_directory=tmp_path, require_empty_directory=True)
+    def some_fun(x):
+        pass
 
-        @pycrumbs.tracked(literal_directory=temp, require_empty_directory=True)
-        def some_fun(x):
-            pass
-
-        some_fun(0)
+    some_fun(0)
 
 
-def test_require_empty_fail():
+def test_require_empty_fail(tmp_path):
     """Test tracked with require_empty_directory True when non-empty'."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        temp_content = temp / 'junk'
-        temp_content.touch()
+    temp_content = tmp_path / 'junk'
+    temp_content.touch()
 
-        @pycrumbs.tracked(literal_directory=temp, require_empty_directory=True)
-        def some_fun(x):
-            pass
+    @tracked(literal_directory=tmp_path, require_empty_directory=True)
+    def some_fun(x):
+        pass
 
-        with pytest.raises(FileExistsError):
-            some_fun(0)
+    with pytest.raises(FileExistsError):
+        some_fun(0)
 
 
-def test_parents():
+def test_parents(tmp_path):
     """Test tracked with create_parents is True."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
-        subdir = temp / 'subdir'
+    subdir = tmp_path / 'subdir'
 
-        @pycrumbs.tracked(literal_directory=subdir, create_parents=True)
-        def some_fun(x):
-            pass
+    @tracked(literal_directory=subdir, create_parents=True)
+    def some_fun(x):
+        pass
 
-        some_fun(0)
-        assert subdir.exists()
-        assert subdir.joinpath('some_fun_record.json').exists()
+    some_fun(0)
+    assert subdir.exists()
+    assert (subdir / RECORD_NAME).exists()
 
 
-def test_record_chaining():
-    """Test tracked with chain_records is True."""
-    with tempfile.TemporaryDirectory() as temp:
-        temp = Path(temp).resolve()
+@pytest.mark.parametrize('chain_records', [False, True])
+def test_directory_removed_between_calls(tmp_path, chain_records):
+    """Test tracked recreates output directories removed after a call."""
+    subdir = tmp_path / 'subdir'
 
-        @pycrumbs.tracked(literal_directory=temp, chain_records=True)
-        def some_fun(x):
-            pass
+    @tracked(literal_directory=subdir, chain_records=chain_records)
+    def some_fun(x):
+        pass
 
-        saved_record = temp.joinpath('some_fun_record.json')
-        # If a record does not yet exist, demonstrate regular behavior.
-        assert not saved_record.exists()
-        some_fun(0)
-        assert saved_record.exists()
-        with saved_record.open('r') as jf:
-            record_0 = json.load(jf)
-        assert isinstance(record_0, Dict)
-
-        # If record already exists with 1 element, demonstrate conversion to
-        # list which contains the original record as its first element.
-        some_fun(1)
-        with saved_record.open('r') as jf:
-            record_1 = json.load(jf)
-        assert isinstance(record_1, List)
-        assert len(record_1) == 2
-        assert record_0 == record_1[0]
-
-        # If record already exists as a list of 2+ elements, demonstrate
-        # original elements match previous records and contain a new final element.
-        some_fun(2)
-        with saved_record.open('r') as jf:
-            record_2 = json.load(jf)
-        assert isinstance(record_2, List)
-        assert len(record_2) == 3
-        assert record_0 == record_1[0] == record_2[0]
-        assert record_1[1] == record_2[1]
+    some_fun(0)
+    shutil.rmtree(subdir)
+    some_fun(1)
+    assert (subdir / RECORD_NAME).exists()
+
+
+def test_parent_directory_removed_between_calls(tmp_path):
+    """Test tracked recreates a parent directory removed after a call."""
+    parent = tmp_path / 'parent'
+
+    @tracked(
+        literal_directory=parent,
+        subdirectory_name_parameter='model_name',
+    )
+    def some_fun(x, model_name):
+        pass
+
+    some_fun(0, model_name='my_model')
+    shutil.rmtree(parent)
+    some_fun(1, model_name='my_model')
+    assert (parent / 'my_model' / RECORD_NAME).exists()
+
+
+def test_no_temporary_files(tmp_path):
+    """Test tracked leaves only the record file in the output directory."""
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x):
+        assert list(tmp_path.iterdir()) == [tmp_path / RECORD_NAME]
+
+    some_fun(0)
+    assert list(tmp_path.iterdir()) == [tmp_path / RECORD_NAME]
+
+
+def test_record_chaining(tmp_path):
+    """Test tracked with chain_records is True."""
+    @tracked(literal_directory=tmp_path, chain_records=True)
+    def some_fun(x):
+        pass
+
+    saved_record = tmp_path / RECORD_NAME
+    # If a record does not yet exist, demonstrate regular behavior.
+    assert not saved_record.exists()
+    some_fun(0)
+    assert saved_record.exists()
+    record_0 = load_record(saved_record)
+    assert isinstance(record_0, Dict)
+
+    # If record already exists with 1 element, demonstrate conversion to
+    # list which contains the original record as its first element.
+    some_fun(1)
+    record_1 = load_record(saved_record)
+    assert isinstance(record_1, List)
+    assert len(record_1) == 2
+    assert record_0 == record_1[0]
+
+    # If record already exists as a list of 2+ elements, demonstrate
+    # original elements match previous records and contain a new final element.
+    some_fun(2)
+    record_2 = load_record(saved_record)
+    assert isinstance(record_2, List)
+    assert len(record_2) == 3
+    assert record_0 == record_1[0] == record_2[0]
+    assert record_1[1] == record_2[1]
+
+    # Every chained record is completed once its function has returned
+    for record in record_2:
+        assert 'end_time' in record['timing']
+        assert 'run_time' in record['timing']
+    assert record_2[2]['called_function']['parameters'] == {'x': 2}
+
+
+def test_record_chaining_legacy_non_finite(tmp_path):
+    """Test chaining onto a record file containing non-finite floats."""
+    @tracked(literal_directory=tmp_path, chain_records=True)
+    def some_fun(x):
+        pass
+
+    saved_record = tmp_path / RECORD_NAME
+    legacy_record = {'uuid': str(uuid4()), 'max_epochs': float('inf')}
+    with saved_record.open('w') as jf:
+        json.dump(legacy_record, jf, indent=4)
+
+    some_fun(0)
+    records = load_record(saved_record)
+    assert isinstance(records, List)
+    assert len(records) == 2
+    assert records[0] == legacy_record
+    assert_common(records[1])
+
+
+def test_record_concurrent(tmp_path):
+    """Test tracked with overlapping calls writing the same record."""
+    @tracked(literal_directory=tmp_path)
+    def some_fun(x):
+        time.sleep(0.001 * (x % 3))
+
+    errors = []
+
+    def run_calls():
+        try:
+            for x in range(50):
+                some_fun(x)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run_calls) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert_common(load_record(tmp_path / RECORD_NAME))
+    assert [p.name for p in tmp_path.iterdir()] == [RECORD_NAME]
+
+
+def test_record_chaining_concurrent(tmp_path):
+    """Test tracked with chain_records is True and overlapping calls."""
+    @tracked(literal_directory=tmp_path, chain_records=True)
+    def some_fun(x):
+        time.sleep(0.001 * (x % 3))
+
+    def run_calls():
+        for x in range(5):
+            some_fun(x)
+
+    threads = [threading.Thread(target=run_calls) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records = load_record(tmp_path / RECORD_NAME)
+    assert isinstance(records, List)
+    assert len(records) == 20
+    assert len({record['uuid'] for record in records}) == 20
+    for record in records:
+        assert_common(record)